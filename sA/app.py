@@ -1,36 +1,48 @@
+# Size eventlet's native thread pool (used for password hashing) to the CPU
+# count; tpool reads this when eventlet is first imported
+import os
+os.environ.setdefault('EVENTLET_THREADPOOL_SIZE', str(os.cpu_count() or 1))
+
+# Patch the stdlib for cooperative sockets before anything else imports it
+import eventlet
+eventlet.monkey_patch()
+
+# psycopg2 is a C driver; make its socket waits yield to the eventlet hub
+from psycogreen.eventlet import patch_psycopg
+patch_psycopg()
+
 from flask import Flask, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_cors import CORS
 import requests
+import hmac
+import random
 import threading
 import time
-import os
 import logging
 import redis
 from redis.exceptions import RedisError
 from functools import wraps
 import grpc
 from concurrent import futures
-from sqlalchemy import text
+from sqlalchemy import text, update, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 from flask_socketio import SocketIO, emit, join_room, leave_room
+from eventlet import tpool
 import json
+from redis_pool import REDIS_HOST, REDIS_PORT, redis_pool
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
 
-# Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*")
-
-# Lobby storage
-active_lobbies = {}
-user_sessions = {}
-
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -39,25 +51,40 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key')
 app.config['REQUEST_TIMEOUT'] = int(os.getenv('REQUEST_TIMEOUT', 5))
 GATEWAY_SECRET = os.getenv('GATEWAY_SECRET', 'your-gateway-secret')
+GATEWAY_SECRET_BYTES = GATEWAY_SECRET.encode()
+
+# Pre-encoded so rejected requests skip jsonify
+UNAUTHORIZED_RESPONSE = (b'{"error":"Unauthorized"}', 401, {'Content-Type': 'application/json'})
 
-# Redis Configuration
-REDIS_HOST = os.getenv('REDIS_HOST', 'api-gateway-redis-1')
-REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 100))
 current_requests = 0
 
+# Initialize SocketIO (Redis message queue lets every worker broadcast to every room).
+# eventlet serves each connection as a green thread instead of an OS thread.
+socketio = SocketIO(
+    app,
+    async_mode='eventlet',
+    message_queue=f'redis://{REDIS_HOST}:{REDIS_PORT}',
+    cors_allowed_origins="*"
+)
+
+# Lobby storage lives in Redis so all workers share the same view:
+#   lobby:{id}          hash  host_id, status, max_players
+#   lobby:{id}:players  set   user ids
+#   lobby:{id}:ready    set   ids of players who are ready
+LOBBY_MAX_PLAYERS = 4
+LOBBY_TTL = int(os.getenv('LOBBY_TTL', 3600))
+
+# Socket sessions are kept in Redis as sess:{sid} -> user id
+SESSION_TTL = int(os.getenv('SESSION_TTL', 3600))
+
 # Initialize extensions
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
 
 # Initialize Redis
 try:
-    redis_client = redis.Redis(
-        host=REDIS_HOST,
-        port=REDIS_PORT,
-        decode_responses=True,
-        socket_connect_timeout=5
-    )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     redis_client.ping()
     logger.info("Redis connection successful")
 except RedisError as e:
@@ -65,13 +92,20 @@ except RedisError as e:
     redis_client = None
 
 
-class Lobby:
-    def __init__(self, lobby_id, host_id):
-        self.lobby_id = lobby_id
-        self.host_id = host_id
-        self.players = {host_id: {"ready": False}}
-        self.max_players = 4
-        self.status = "waiting"
+def lobby_keys(lobby_id):
+    return f'lobby:{lobby_id}', f'lobby:{lobby_id}:players', f'lobby:{lobby_id}:ready'
+
+def lobby_store_available():
+    if redis_client is None:
+        emit('error', {'message': 'Lobby service unavailable'})
+        return False
+    return True
+
+def session_user():
+    if redis_client is None:
+        return None
+    # Slide the TTL on every event so a session lasts as long as the connection
+    return redis_client.getex(f'sess:{request.sid}', ex=SESSION_TTL)
 
 @socketio.on('connect')
 def handle_connect():
@@ -79,22 +113,39 @@ def handle_connect():
     try:
         # Verify JWT token
         user_id = verify_jwt_token(token)
-        user_sessions[request.sid] = user_id
+        redis_client.setex(f'sess:{request.sid}', SESSION_TTL, user_id)
         emit('connection_success', {'message': 'Connected to lobby service'})
     except Exception as e:
         return False  # Reject connection
 
+@socketio.on('disconnect')
+def handle_disconnect():
+    if redis_client is not None:
+        redis_client.delete(f'sess:{request.sid}')
+
 @socketio.on('create_lobby')
 def handle_create_lobby(data):
-    user_id = user_sessions.get(request.sid)
+    user_id = session_user()
     if not user_id:
         emit('error', {'message': 'Not authenticated'})
         return
+    if not lobby_store_available():
+        return
 
     lobby_id = generate_lobby_id()
-    new_lobby = Lobby(lobby_id, user_id)
-    active_lobbies[lobby_id] = new_lobby
-    
+    lobby_key, players_key, ready_key = lobby_keys(lobby_id)
+
+    pipe = redis_client.pipeline()
+    pipe.hset(lobby_key, mapping={
+        'host_id': user_id,
+        'status': 'waiting',
+        'max_players': LOBBY_MAX_PLAYERS
+    })
+    pipe.sadd(players_key, user_id)
+    pipe.expire(lobby_key, LOBBY_TTL)
+    pipe.expire(players_key, LOBBY_TTL)
+    pipe.execute()
+
     join_room(lobby_id)
     emit('lobby_created', {
         'lobby_id': lobby_id,
@@ -104,70 +155,105 @@ def handle_create_lobby(data):
 @socketio.on('join_lobby')
 def handle_join_lobby(data):
     lobby_id = data.get('lobby_id')
-    user_id = user_sessions.get(request.sid)
-    
+    user_id = session_user()
+
     if not lobby_id or not user_id:
         emit('error', {'message': 'Invalid request'})
         return
-        
-    lobby = active_lobbies.get(lobby_id)
+    if not lobby_store_available():
+        return
+
+    lobby_key, players_key, ready_key = lobby_keys(lobby_id)
+    lobby = redis_client.hgetall(lobby_key)
     if not lobby:
         emit('error', {'message': 'Lobby not found'})
         return
-        
-    if len(lobby.players) >= lobby.max_players:
+
+    # Add first and roll back if over capacity, so concurrent joins can't overfill.
+    # Activity keeps the lobby alive for another LOBBY_TTL.
+    pipe = redis_client.pipeline()
+    pipe.sadd(players_key, user_id)
+    pipe.smembers(players_key)
+    for key in (lobby_key, players_key, ready_key):
+        pipe.expire(key, LOBBY_TTL)
+    added, players = pipe.execute()[:2]
+    if len(players) > int(lobby['max_players']):
+        if added:
+            redis_client.srem(players_key, user_id)
         emit('error', {'message': 'Lobby is full'})
         return
-    
-    lobby.players[user_id] = {"ready": False}
+
     join_room(lobby_id)
-    
+
     emit('player_joined', {
         'user_id': user_id,
         'lobby_info': {
-            'players': list(lobby.players.keys()),
-            'host_id': lobby.host_id,
-            'status': lobby.status
+            'players': list(players),
+            'host_id': lobby['host_id'],
+            'status': lobby['status']
         }
     }, room=lobby_id)
 
 @socketio.on('player_ready')
 def handle_player_ready(data):
     lobby_id = data.get('lobby_id')
-    user_id = user_sessions.get(request.sid)
-    
-    lobby = active_lobbies.get(lobby_id)
-    if lobby and user_id in lobby.players:
-        lobby.players[user_id]["ready"] = True
-        
-        all_ready = all(player["ready"] for player in lobby.players.values())
-        if all_ready:
-            lobby.status = "starting"
-            emit('game_starting', {
-                'lobby_id': lobby_id,
-                'players': list(lobby.players.keys())
-            }, room=lobby_id)
+    user_id = session_user()
+
+    if not lobby_id or not user_id or not lobby_store_available():
+        return
+
+    lobby_key, players_key, ready_key = lobby_keys(lobby_id)
+    if not redis_client.sismember(players_key, user_id):
+        return
+
+    # Compare set sizes instead of walking every player's flag
+    pipe = redis_client.pipeline()
+    pipe.sadd(ready_key, user_id)
+    pipe.scard(ready_key)
+    pipe.scard(players_key)
+    for key in (lobby_key, players_key, ready_key):
+        pipe.expire(key, LOBBY_TTL)
+    _, ready_count, player_count = pipe.execute()[:3]
+    if ready_count == player_count:
+        redis_client.hset(lobby_key, 'status', 'starting')
+        emit('game_starting', {
+            'lobby_id': lobby_id,
+            'players': list(redis_client.smembers(players_key))
+        }, room=lobby_id)
 
 @socketio.on('leave_lobby')
 def handle_leave_lobby(data):
     lobby_id = data.get('lobby_id')
-    user_id = user_sessions.get(request.sid)
-    
-    lobby = active_lobbies.get(lobby_id)
-    if lobby and user_id in lobby.players:
-        leave_room(lobby_id)
-        del lobby.players[user_id]
-        
-        if len(lobby.players) == 0:
-            del active_lobbies[lobby_id]
-        elif user_id == lobby.host_id:
-            # Assign new host
-            lobby.host_id = next(iter(lobby.players))
-        
-        emit('player_left', {
-            'user_id': user_id,
-            'new_host_id': lobby.host_id
-        }, room=lobby_id)
+    user_id = session_user()
+
+    if not lobby_id or not user_id or not lobby_store_available():
+        return
+
+    lobby_key, players_key, ready_key = lobby_keys(lobby_id)
+    pipe = redis_client.pipeline()
+    pipe.srem(players_key, user_id)
+    pipe.srem(ready_key, user_id)
+    pipe.scard(players_key)
+    pipe.hget(lobby_key, 'host_id')
+    removed, _, remaining, host_id = pipe.execute()
+    if not removed:
+        return
+
+    leave_room(lobby_id)
+    if remaining and host_id == str(user_id):
+        # Assign new host; the others may have left since SCARD
+        host_id = redis_client.srandmember(players_key)
+        if host_id is not None:
+            redis_client.hset(lobby_key, 'host_id', host_id)
+        else:
+            remaining = 0
+    if remaining == 0:
+        redis_client.delete(lobby_key, players_key, ready_key)
+
+    emit('player_left', {
+        'user_id': user_id,
+        'new_host_id': host_id
+    }, room=lobby_id)
 
 # Helper functions
 def generate_lobby_id():
@@ -178,6 +264,11 @@ def verify_jwt_token(token):
     # Use your existing JWT verification logic
     pass
 
+# Score updates are buffered in Redis as score_delta:{user_id} hashes and
+# flushed to Postgres in one batched UPDATE every SCORE_FLUSH_INTERVAL seconds
+SCORE_FLUSH_INTERVAL = int(os.getenv('SCORE_FLUSH_INTERVAL', 5))
+SCORE_FIELDS = ('score', 'games_played', 'games_won')
+
 # Circuit Breaker Configuration
 FAILURE_THRESHOLD = 3
 RECOVERY_TIMEOUT = 60
@@ -191,62 +282,31 @@ circuit_state = {
 # Database Model
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    username = db.Column(db.String(80), unique=True, index=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, index=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     score = db.Column(db.Integer, default=0)
     games_played = db.Column(db.Integer, default=0)
     games_won = db.Column(db.Integer, default=0)
 
-    def __init__(self, username, email, password):
+    def __init__(self, username, email, password_hash):
         self.username = username
         self.email = email
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hash
 
 # Middleware
-def verify_gateway_request():
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Skip verification for health check endpoint
-            if request.path == '/ping':
-                return f(*args, **kwargs)
-            
-            gateway_token = request.headers.get('X-Gateway-Token')
-            if not gateway_token or gateway_token != GATEWAY_SECRET:
-                return jsonify({'error': 'Unauthorized'}), 401
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
-
 @app.before_request
 def before_request():
-    # Skip verification for health checks
-    if request.path == '/ping':
+    # Skip verification for readiness probes (/ping never reaches Flask)
+    if request.path == '/ready':
         return None
-    
-    print("Request Path:", request.path)
-    print("Request Headers:", request.headers)
-    print("Gateway Secret:", GATEWAY_SECRET)
-    
-    gateway_token = request.headers.get('X-Gateway-Token')
-    print("Received Gateway Token:", gateway_token)
-    
-    if not gateway_token or gateway_token != GATEWAY_SECRET:
-        print("Gateway token mismatch or missing")
-        return jsonify({'error': 'Unauthorized'}), 401
-
-    # For debugging JWT token
-    auth_header = request.headers.get('Authorization')
-    print("Auth Header:", auth_header)
-
-    print("\n=== Request Debug Info ===")
-    print(f"Path: {request.path}")
-    print(f"Method: {request.method}")
-    print(f"Headers: {dict(request.headers)}")
-    print(f"Expected Gateway Secret: {GATEWAY_SECRET}")
-    print("==========================\n")
+
+    gateway_token = request.headers.get('X-Gateway-Token', '')
+    if not hmac.compare_digest(gateway_token.encode(), GATEWAY_SECRET_BYTES):
+        return UNAUTHORIZED_RESPONSE
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("gateway check path=%s method=%s", request.path, request.method)
 
 @app.after_request
 def after_request(response):
@@ -278,13 +338,22 @@ def circuit_breaker(func):
             raise e
     return wrapper
 
-# Modify the service registration function
+# Service registration
+REGISTRATION_INTERVAL = 30  # seconds
+REGISTRATION_BACKOFF_BASE = 5  # seconds
+REGISTRATION_BACKOFF_MAX = 60  # seconds
+
+# Reused across registrations so the gateway connection is kept alive
+gateway_session = requests.Session()
+gateway_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+
 def register_with_gateway():
+    attempt = 0
     while True:
         try:
             headers = {'X-Gateway-Token': GATEWAY_SECRET}
             
-            response = requests.post(
+            response = gateway_session.post(
                 'http://api-gateway:8080/sA/register',
                 headers=headers,
                 json={
@@ -294,10 +363,15 @@ def register_with_gateway():
                 timeout=5
             )
             logger.info(f"Registration response: {response.status_code}")
-            time.sleep(30)
+            attempt = 0
+            time.sleep(REGISTRATION_INTERVAL)
         except Exception as e:
-            logger.error(f"Registration failed: {str(e)}")
-            time.sleep(5)
+            # Exponential backoff with jitter so replicas don't retry in lockstep
+            delay = min(REGISTRATION_BACKOFF_MAX, REGISTRATION_BACKOFF_BASE * 2 ** attempt)
+            delay *= random.uniform(0.5, 1.5)
+            attempt = min(attempt + 1, 10)
+            logger.error(f"Registration failed: {str(e)}, retrying in {delay:.1f}s")
+            time.sleep(delay)
 
 # Database initialization
 def init_db():
@@ -322,11 +396,86 @@ def init_db():
                 logger.error("Max retries reached. Database initialization failed.")
                 return False
 
+# Score buffering
+def pending_score_deltas(user_id):
+    """Return the score deltas buffered in Redis that haven't reached Postgres yet"""
+    if redis_client is None:
+        return dict.fromkeys(SCORE_FIELDS, 0)
+    try:
+        deltas = redis_client.hmget(f'score_delta:{user_id}', SCORE_FIELDS)
+    except RedisError as e:
+        # Serve the Postgres values rather than failing the read
+        logger.warning(f"Score buffer unavailable, reading without pending deltas: {e}")
+        return dict.fromkeys(SCORE_FIELDS, 0)
+    return {field: int(value or 0) for field, value in zip(SCORE_FIELDS, deltas)}
+
+def flush_score_deltas():
+    users = User.__table__
+    stmt = update(users).where(users.c.id == bindparam('user_id')).values(
+        score=users.c.score + bindparam('d_score'),
+        games_played=users.c.games_played + bindparam('d_games_played'),
+        games_won=users.c.games_won + bindparam('d_games_won')
+    )
+
+    while True:
+        time.sleep(SCORE_FLUSH_INTERVAL)
+        if redis_client is None:
+            continue
+
+        batch = []
+        try:
+            for key in redis_client.scan_iter(match='score_delta:*', count=500):
+                # Read and clear in one transaction so concurrent increments land in the next batch
+                pipe = redis_client.pipeline()
+                pipe.hgetall(key)
+                pipe.delete(key)
+                deltas, _ = pipe.execute()
+                if deltas:
+                    batch.append({
+                        'user_id': int(key.split(':', 1)[1]),
+                        **{f'd_{field}': int(deltas.get(field, 0)) for field in SCORE_FIELDS}
+                    })
+            if not batch:
+                continue
+
+            with app.app_context():
+                db.session.execute(stmt, batch)
+                db.session.commit()
+            logger.info(f"Flushed score updates for {len(batch)} users")
+        except Exception as e:
+            logger.error(f"Score flush failed: {e}")
+            # Put the drained deltas back so the next flush retries them
+            try:
+                pipe = redis_client.pipeline()
+                for row in batch:
+                    for field in SCORE_FIELDS:
+                        pipe.hincrby(f"score_delta:{row['user_id']}", field, row[f'd_{field}'])
+                pipe.execute()
+            except RedisError as e:
+                logger.error(f"Failed to restore score updates: {e}")
+
+# Liveness probe
+class PingMiddleware:
+    """Answer /ping before Flask routing, middleware and the database are involved"""
+    BODY = b'{"status":"healthy"}'
+    HEADERS = [('Content-Type', 'application/json'), ('Content-Length', str(len(BODY)))]
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == '/ping':
+            start_response('200 OK', self.HEADERS)
+            return [self.BODY]
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = PingMiddleware(app.wsgi_app)
+
 # Endpoints
 
 
-@app.route('/ping', methods=['GET'])
-def health_check():
+@app.route('/ready', methods=['GET'])
+def readiness_check():
     try:
         db.session.execute(text('SELECT 1'))
         db_status = 'healthy'
@@ -339,45 +488,44 @@ def health_check():
     except Exception:
         redis_status = 'unhealthy'
 
+    ready = db_status == 'healthy' and redis_status == 'healthy'
     return jsonify({
         'service': 'User & Score Service',
-        'status': 'healthy',
+        'status': 'healthy' if ready else 'unhealthy',
         'database': db_status,
         'redis': redis_status,
         'circuit_breaker': circuit_state['status'],
         'current_requests': current_requests
-    }), 200
+    }), 200 if ready else 503
 
 @app.route('/api/users/auth/signup', methods=['POST'])
-@verify_gateway_request()
 @circuit_breaker
 def signup():
     try:
-    #debug
-        print("=== Signup Request ===")
-        print(f"Headers: {dict(request.headers)}")
-        print(f"Body: {request.get_json()}")
-        print(f"Gateway Secret: {GATEWAY_SECRET}")
-        print("=====================")
-
         data = request.get_json()
         if not data or not all(k in data for k in ['username', 'email', 'password']):
             return jsonify({'error': 'Missing required fields'}), 400
 
-        if User.query.filter_by(email=data['email']).first():
-            return jsonify({'error': 'Email already registered'}), 409
-
-        if User.query.filter_by(username=data['username']).first():
-            return jsonify({'error': 'Username already taken'}), 409
-
+        # Hashing is CPU-bound; run it on a native thread so the event loop keeps serving
         new_user = User(
             username=data['username'],
             email=data['email'],
-            password=data['password']
+            password_hash=tpool.execute(generate_password_hash, data['password'])
         )
-        
-        db.session.add(new_user)
-        db.session.commit()
+
+        # Unique indexes are the source of truth; only look up the
+        # conflicting column when the insert has already failed
+        try:
+            db.session.add(new_user)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            email_taken = db.session.query(
+                User.query.filter_by(email=data['email']).exists()
+            ).scalar()
+            if email_taken:
+                return jsonify({'error': 'Email already registered'}), 409
+            return jsonify({'error': 'Username already taken'}), 409
 
         return jsonify({
             'message': 'User created successfully',
@@ -390,7 +538,6 @@ def signup():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/users/auth/signin', methods=['POST'])
-@verify_gateway_request()
 @circuit_breaker
 def signin():
     try:
@@ -399,7 +546,7 @@ def signin():
             return jsonify({'error': 'Missing email or password'}), 400
 
         user = User.query.filter_by(email=data['email']).first()
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user or not tpool.execute(check_password_hash, user.password_hash, data['password']):
             return jsonify({'error': 'Invalid credentials'}), 401
 
         access_token = create_access_token(identity=user.id)
@@ -414,21 +561,24 @@ def signin():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/score/user/<int:user_id>', methods=['GET'])
-@verify_gateway_request()
 @jwt_required()
 @circuit_breaker
 def get_user_score(user_id):
     try:
-        user = User.query.get(user_id)
+        # Skip the password_hash column, scores are all this endpoint returns
+        user = db.session.get(User, user_id, options=[
+            load_only(User.username, User.score, User.games_played, User.games_won)
+        ])
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
+        pending = pending_score_deltas(user_id)
         return jsonify({
             'user_id': user.id,
             'username': user.username,
-            'score': user.score,
-            'games_played': user.games_played,
-            'games_won': user.games_won
+            'score': user.score + pending['score'],
+            'games_played': user.games_played + pending['games_played'],
+            'games_won': user.games_won + pending['games_won']
         }), 200
 
     except Exception as e:
@@ -436,7 +586,6 @@ def get_user_score(user_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/score/update', methods=['POST'])
-@verify_gateway_request()
 @jwt_required()
 @circuit_breaker
 def update_score():
@@ -445,22 +594,39 @@ def update_score():
         if not data or 'user_id' not in data or 'score_change' not in data:
             return jsonify({'error': 'Missing required fields'}), 400
 
-        user = User.query.get(data['user_id'])
+        user = db.session.get(User, data['user_id'], options=[
+            load_only(User.score, User.games_played, User.games_won)
+        ])
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        user.score += data['score_change']
-        if data.get('game_won', False):
-            user.games_won += 1
-        user.games_played += 1
-
-        db.session.commit()
+        games_won = 1 if data.get('game_won', False) else 0
+
+        pending = None
+        if redis_client is not None:
+            key = f"score_delta:{user.id}"
+            pipe = redis_client.pipeline()
+            pipe.hincrby(key, 'score', data['score_change'])
+            pipe.hincrby(key, 'games_played', 1)
+            pipe.hincrby(key, 'games_won', games_won)
+            try:
+                pending = dict(zip(SCORE_FIELDS, pipe.execute()))
+            except RedisError as e:
+                logger.warning(f"Score buffer unavailable, writing through: {e}")
+
+        if pending is None:
+            # No buffer available, write straight through
+            user.score += data['score_change']
+            user.games_won += games_won
+            user.games_played += 1
+            db.session.commit()
+            pending = dict.fromkeys(SCORE_FIELDS, 0)
 
         return jsonify({
             'message': 'Score updated successfully',
-            'new_score': user.score,
-            'games_played': user.games_played,
-            'games_won': user.games_won
+            'new_score': user.score + pending['score'],
+            'games_played': user.games_played + pending['games_played'],
+            'games_won': user.games_won + pending['games_won']
         }), 200
 
     except Exception as e:
@@ -483,6 +649,10 @@ if __name__ == '__main__':
         # Start service registration in background
         registration_thread = threading.Thread(target=register_with_gateway, daemon=True)
         registration_thread.start()
+
+        # Start periodic score flush in background
+        score_flush_thread = threading.Thread(target=flush_score_deltas, daemon=True)
+        score_flush_thread.start()
         
         # Start Flask app
         socketio.run(app, host='0.0.0.0', port=5000)
@@ -1,5 +1,5 @@
 import pytest
-from app import app, db, User
+from app import app, db, User, GATEWAY_SECRET
 import json
 
 @pytest.fixture
@@ -11,8 +11,8 @@ def client():
         with app.app_context():
             db.create_all()
             yield client
-        db.session.remove()
-        db.drop_all()
+            db.session.remove()
+            db.drop_all()
 
 def test_health_check(client):
     response = client.get('/ping')
@@ -20,6 +20,12 @@ def test_health_check(client):
     data = json.loads(response.data)
     assert data['status'] == 'healthy'
 
+def test_readiness_check(client):
+    response = client.get('/ready')
+    data = json.loads(response.data)
+    assert data['database'] == 'healthy'
+    assert response.status_code == (200 if data['redis'] == 'healthy' else 503)
+
 def test_signup(client):
     response = client.post('/api/users/auth/signup', json={
         'username': 'testuser',
@@ -41,4 +47,20 @@ def test_signin(client):
         'email': 'test@test.com',
         'password': 'password123'
     })
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_signup_duplicate_email(client):
+    headers = {'X-Gateway-Token': GATEWAY_SECRET}
+    client.post('/api/users/auth/signup', headers=headers, json={
+        'username': 'testuser',
+        'email': 'test@test.com',
+        'password': 'password123'
+    })
+
+    response = client.post('/api/users/auth/signup', headers=headers, json={
+        'username': 'otheruser',
+        'email': 'test@test.com',
+        'password': 'password123'
+    })
+    assert response.status_code == 409
+    assert json.loads(response.data)['error'] == 'Email already registered'
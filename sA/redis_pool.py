@@ -0,0 +1,19 @@
+import os
+import redis
+
+# Redis Configuration
+REDIS_HOST = os.getenv('REDIS_HOST', 'api-gateway-redis-1')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+
+# One pool per process, shared by app.py and register.py, so connections
+# are reused across requests and green threads instead of reopened. Callers
+# wait for a free connection rather than failing when all are checked out.
+redis_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    max_connections=int(os.getenv('REDIS_POOL', 32)),
+    timeout=5,
+    decode_responses=True,
+    socket_connect_timeout=5,
+    health_check_interval=30
+)
@@ -1,23 +1,15 @@
 import redis
 import time
-import os
+from redis_pool import REDIS_HOST, REDIS_PORT, redis_pool
 
 def register_service():
     print("Starting service registration...")
-    # Get Redis connection details from environment variables
-    redis_host = os.getenv('REDIS_HOST', 'api-gateway-redis-1')
-    redis_port = int(os.getenv('REDIS_PORT', 6379))
-    print(f"Will connect to Redis at {redis_host}:{redis_port}")
+    print(f"Will connect to Redis at {REDIS_HOST}:{REDIS_PORT}")
+    redis_client = redis.Redis(connection_pool=redis_pool)
     
     while True:
         try:
-            print(f"Attempting to connect to Redis at {redis_host}:{redis_port}")
-            redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                decode_responses=True,
-                socket_connect_timeout=5
-            )
+            print(f"Attempting to connect to Redis at {REDIS_HOST}:{REDIS_PORT}")
             redis_client.ping()
             print("Successfully connected to Redis")
             break
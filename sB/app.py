@@ -1,14 +1,20 @@
 import os
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, copy_current_request_context
 from flask_pymongo import PyMongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure
+from bson import ObjectId
+from bson.errors import InvalidId
 import redis
 import grpc
 from concurrent import futures
 import time
 from datetime import datetime
 import json
+import orjson
 from functools import wraps
 import threading
+import queue
 from prometheus_client import Counter, Gauge, start_http_server
 import logging
 from typing import Dict, Any
@@ -39,6 +45,12 @@ MAX_CONCURRENT_REQUESTS = 100
 REQUEST_TIMEOUT = 5  # seconds
 ERROR_THRESHOLD = 3
 RESET_TIMEOUT = 60  # seconds
+MONGO_BATCH_SIZE = 50
+MONGO_FLUSH_INTERVAL = 0.05  # seconds
+MONGO_MAX_RETRIES = 5
+MONGO_RETRY_BACKOFF = 0.1  # seconds, doubled per attempt
+GAME_CACHE_TTL = 3600  # 1 hour expiration
+HEALTH_CACHE_TTL = 2.0  # seconds
 
 # Metrics
 REQUESTS = Counter('game_service_requests_total', 'Total requests')
@@ -58,34 +70,67 @@ class CircuitBreaker:
         with self.lock:
             self.errors += 1
             self.last_error_time = time.time()
-            if self.errors >= ERROR_THRESHOLD:
+            # A failed half-open probe reopens immediately
+            if self.state == "HALF_OPEN" or (self.state == "CLOSED" and self.errors >= ERROR_THRESHOLD):
                 self.state = "OPEN"
                 logger.warning("Circuit breaker opened")
 
     def record_success(self):
+        # Lock-free fast path: nothing to reset on a healthy breaker
+        if self.state == "CLOSED" and self.errors == 0:
+            return
         with self.lock:
-            self.errors = 0
-            if self.state == "OPEN" and (time.time() - self.last_error_time) > RESET_TIMEOUT:
+            if self.state == "HALF_OPEN":
                 self.state = "CLOSED"
                 logger.info("Circuit breaker closed")
+            if self.state != "OPEN":
+                self.errors = 0
+
+    def allow_request(self):
+        """Return True if the request may proceed; lets one probe through once RESET_TIMEOUT has passed"""
+        state = self.state
+        if state == "CLOSED":
+            return True
+        # Rejections while OPEN or probing stay lock-free; only the transition locks
+        if state == "HALF_OPEN" or (time.time() - self.last_error_time) <= RESET_TIMEOUT:
+            return False
+        with self.lock:
+            if self.state == "OPEN" and (time.time() - self.last_error_time) > RESET_TIMEOUT:
+                self.state = "HALF_OPEN"
+                logger.info("Circuit breaker half-open, sending probe")
+                return True
+            return False
 
     def is_open(self):
+        # str attribute loads are atomic, no lock needed on the read path
         return self.state == "OPEN"
 
 circuit_breaker = CircuitBreaker()
 
 # Decorators
+def response_status(result) -> int:
+    """Status code of a view's return value (Response or (body, status) tuple)"""
+    if isinstance(result, tuple):
+        return result[1] if len(result) > 1 and isinstance(result[1], int) else 200
+    return getattr(result, 'status_code', 200)
+
 def with_circuit_breaker(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if circuit_breaker.is_open():
+        if not circuit_breaker.allow_request():
             return jsonify({"error": "Service temporarily unavailable"}), 503
         
         try:
             start_time = time.time()
             result = func(*args, **kwargs)
             REQUEST_LATENCY.set(time.time() - start_time)
-            circuit_breaker.record_success()
+            # Routes catch their own exceptions, so failures surface as 5xx/408 responses
+            status_code = response_status(result)
+            if status_code >= 500 or status_code == 408:
+                circuit_breaker.record_error()
+                ERROR_COUNTER.inc()
+            else:
+                circuit_breaker.record_success()
             return result
         except Exception as e:
             circuit_breaker.record_error()
@@ -93,35 +138,175 @@ def with_circuit_breaker(func):
             raise
     return wrapper
 
+# Handlers run on this pool so with_timeout can stop waiting at the deadline
+handler_executor = futures.ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_REQUESTS,
+    thread_name_prefix='handler'
+)
+
 def with_timeout(timeout_seconds):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
-            while time.time() - start_time < timeout_seconds:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if time.time() - start_time >= timeout_seconds:
-                        return jsonify({"error": "Request timeout"}), 408
-                    raise
-            return jsonify({"error": "Request timeout"}), 408
+            # Shared with the handler thread through the (copied) request's environ
+            cancelled = threading.Event()
+            request.environ['game_service.cancelled'] = cancelled
+            future = handler_executor.submit(
+                copy_current_request_context(func), *args, **kwargs
+            )
+            try:
+                return future.result(timeout=timeout_seconds)
+            except futures.TimeoutError:
+                # The handler keeps running in the pool; it checks request_cancelled()
+                # before writing so a timed-out request doesn't apply behind the client's back
+                cancelled.set()
+                logger.warning(f"{func.__name__} exceeded {timeout_seconds}s timeout")
+                return jsonify({"error": "Request timeout"}), 408
         return wrapper
     return decorator
 
+def request_cancelled() -> bool:
+    """True once with_timeout has answered the client for the current request"""
+    cancelled = request.environ.get('game_service.cancelled')
+    return cancelled is not None and cancelled.is_set()
+
+# Mongo write-behind: moves are acknowledged once Redis holds the new state,
+# and the Mongo updates are persisted here in batches
+mongo_write_queue = queue.Queue()
+
+def mongo_writer():
+    while True:
+        ops = [mongo_write_queue.get()]
+        deadline = time.monotonic() + MONGO_FLUSH_INTERVAL
+        while len(ops) < MONGO_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                ops.append(mongo_write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        write_game_updates(ops)
+
+def write_game_updates(ops):
+    """Persist a batch in order.
+
+    Connection failures are retried with backoff; the ops are idempotent, so
+    re-sending ones that were already applied is harmless. An op MongoDB
+    rejects is logged and skipped, and the ops after it are still written.
+    """
+    attempt = 0
+    while ops:
+        try:
+            # Ordered within this worker; across workers moves are ordered by seq
+            mongo.db.games.bulk_write(ops, ordered=True)
+            return
+        except BulkWriteError as e:
+            ERROR_COUNTER.inc()
+            write_errors = e.details.get('writeErrors')
+            if not write_errors:
+                # Only the write concern failed; the ops themselves were applied
+                logger.warning(f"Write concern error persisting game updates: {e.details.get('writeConcernErrors')}")
+                return
+            # Ops before the failed one were applied, the ones after were never tried
+            failed = write_errors[0]
+            logger.error(f"Dropping game update rejected by MongoDB: {failed.get('errmsg')}")
+            ops = ops[failed['index'] + 1:]
+        except ConnectionFailure as e:
+            ERROR_COUNTER.inc()
+            attempt += 1
+            if attempt >= MONGO_MAX_RETRIES:
+                logger.error(f"Dropping {len(ops)} game updates after {attempt} attempts: {str(e)}")
+                return
+            logger.warning(f"Error persisting {len(ops)} game updates (attempt {attempt}): {str(e)}")
+            time.sleep(MONGO_RETRY_BACKOFF * 2 ** (attempt - 1))
+        except Exception as e:
+            ERROR_COUNTER.inc()
+            logger.error(f"Dropping {len(ops)} game updates: {str(e)}")
+            return
+
+threading.Thread(target=mongo_writer, name='mongo-writer', daemon=True).start()
+
+# Game State Cache
+# game:{id}:state  hash  scalar fields, with players/deck as JSON
+# game:{id}:moves  list  one JSON entry per move, appended with RPUSH
+# (game:{id} itself is the old JSON-string layout and is left to expire)
+def cache_game(pipe, game_id: str, game: Dict[str, Any]) -> None:
+    """Queue the commands that cache a whole game on a Redis pipeline"""
+    key = f"game:{game_id}"
+    pipe.hset(f"{key}:state", mapping={
+        'lobby_id': game['lobby_id'],
+        'state': game['state'],
+        'timestamp': game['timestamp'],
+        'players': orjson.dumps(game['players']),
+        'deck': orjson.dumps(game['deck'])
+    })
+    pipe.delete(f"{key}:moves")
+    if game['moves']:
+        pipe.rpush(f"{key}:moves", *(orjson.dumps(move, default=str) for move in game['moves']))
+    pipe.expire(f"{key}:state", GAME_CACHE_TTL)
+    pipe.expire(f"{key}:moves", GAME_CACHE_TTL)
+
+def load_cached_game(game_id: str):
+    """Rebuild a game from its cached hash and move list, or None on a cache miss"""
+    key = f"game:{game_id}"
+    pipe = redis_client.pipeline()
+    pipe.hgetall(f"{key}:state")
+    pipe.lrange(f"{key}:moves", 0, -1)
+    fields, moves = pipe.execute()
+    if not fields:
+        return None
+    return {
+        'lobby_id': fields['lobby_id'],
+        'players': orjson.loads(fields['players']),
+        'state': fields['state'],
+        'timestamp': fields['timestamp'],
+        'moves': [orjson.loads(move) for move in moves],
+        'deck': orjson.loads(fields['deck'])
+    }
+
 # Health Check Endpoint
+# (checked_at, error) from the last backend ping, swapped as one tuple
+health_result = (float('-inf'), None)
+health_lock = threading.Lock()
+
+def check_backends():
+    """Ping MongoDB and Redis at most once per HEALTH_CACHE_TTL; returns the error message or None"""
+    global health_result
+    checked_at, error = health_result
+    if time.monotonic() - checked_at < HEALTH_CACHE_TTL:
+        return error
+
+    with health_lock:
+        # Another probe may have refreshed the result while we waited
+        checked_at, error = health_result
+        if time.monotonic() - checked_at < HEALTH_CACHE_TTL:
+            return error
+
+        try:
+            # Check MongoDB connection
+            mongo.db.command('ping')
+
+            # Check Redis connection
+            redis_client.ping()
+            error = None
+        except Exception as e:
+            error = str(e)
+        health_result = (time.monotonic(), error)
+        return error
+
 @app.route('/status', methods=['GET'])
 @with_circuit_breaker
 @with_timeout(REQUEST_TIMEOUT)
 def status() -> Response:
     """Health check endpoint with detailed metrics"""
     try:
-        # Check MongoDB connection
-        mongo.db.command('ping')
-        
-        # Check Redis connection
-        redis_client.ping()
-        
+        error = check_backends()
+        if error is not None:
+            logger.error(f"Health check failed: {error}")
+            return jsonify({"status": "unhealthy", "error": error}), 500
+
         metrics = {
             "status": "healthy",
             "timestamp": datetime.utcnow().isoformat(),
@@ -159,16 +344,22 @@ def start_game() -> Response:
             'deck': initialize_deck()
         }
 
+        if request_cancelled():
+            return jsonify({"error": "Request timeout"}), 408
+
         # Store in MongoDB
         result = mongo.db.games.insert_one(game)
         game_id = str(result.inserted_id)
 
+        if request_cancelled():
+            # The client was already told this failed; don't leave an orphan game
+            mongo.db.games.delete_one({"_id": result.inserted_id})
+            return jsonify({"error": "Request timeout"}), 408
+
         # Cache game state
-        redis_client.setex(
-            f"game:{game_id}",
-            3600,  # 1 hour expiration
-            json.dumps(game)
-        )
+        pipe = redis_client.pipeline()
+        cache_game(pipe, game_id, game)
+        pipe.execute()
 
         ACTIVE_GAMES.inc()
         return jsonify({
@@ -191,13 +382,17 @@ def make_move() -> Response:
         if not data or 'game_id' not in data or 'player_id' not in data or 'move' not in data:
             return jsonify({"error": "Invalid move data"}), 400
 
+        try:
+            game_oid = ObjectId(data['game_id'])
+        except (InvalidId, TypeError):
+            return jsonify({"error": "Game not found"}), 404
+
         # Get game state from cache
-        game = redis_client.get(f"game:{data['game_id']}")
-        if game:
-            game = json.loads(game)
-        else:
+        game = load_cached_game(data['game_id'])
+        cached = game is not None
+        if not cached:
             # Fallback to MongoDB
-            game = mongo.db.games.find_one({"_id": data['game_id']})
+            game = mongo.db.games.find_one({"_id": game_oid})
             if not game:
                 return jsonify({"error": "Game not found"}), 404
 
@@ -207,35 +402,51 @@ def make_move() -> Response:
 
         # Update game state
         game = update_game_state(game, data['player_id'], data['move'])
+        move = game['moves'][-1]
 
-        # Save to MongoDB
-        mongo.db.games.update_one(
-            {"_id": data['game_id']},
-            {"$set": game}
-        )
+        if request_cancelled():
+            return jsonify({"error": "Request timeout"}), 408
+
+        # Save to MongoDB in the background; only the new move goes over the wire.
+        # The seq filter makes the push idempotent if the writer re-sends it, and
+        # $sort keeps moves in order when gunicorn workers persist them out of order.
+        mongo_write_queue.put(UpdateOne(
+            {"_id": game_oid, "moves.seq": {"$ne": move['seq']}},
+            {"$push": {"moves": {"$each": [move], "$sort": {"seq": 1}}}}
+        ))
 
         # Update cache
-        redis_client.setex(
-            f"game:{data['game_id']}",
-            3600,
-            json.dumps(game)
+        key = f"game:{data['game_id']}"
+        pipe = redis_client.pipeline()
+        if cached:
+            pipe.rpush(f"{key}:moves", orjson.dumps(move, default=str))
+            pipe.expire(f"{key}:state", GAME_CACHE_TTL)
+            pipe.expire(f"{key}:moves", GAME_CACHE_TTL)
+        else:
+            cache_game(pipe, data['game_id'], game)
+        pipe.execute()
+
+        game_json = orjson.dumps(game, default=str)
+        return Response(
+            b'{"message":"Move processed successfully","game_state":' + game_json + b'}',
+            status=200,
+            mimetype='application/json'
         )
 
-        return jsonify({
-            "message": "Move processed successfully",
-            "game_state": game
-        }), 200
-
     except Exception as e:
         logger.error(f"Error processing move: {str(e)}")
         return jsonify({"error": "Failed to process move"}), 500
 
 # Game Logic Functions
+RANKS = ('6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+SUITS = ('hearts', 'diamonds', 'clubs', 'spades')
+
+# Built once at import; every game gets its own copies of the cards
+_DECK_TEMPLATE = tuple({'rank': rank, 'suit': suit} for rank in RANKS for suit in SUITS)
+
 def initialize_deck() -> list:
     """Initialize a new deck of cards"""
-    ranks = ['6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-    suits = ['hearts', 'diamonds', 'clubs', 'spades']
-    return [{'rank': rank, 'suit': suit} for rank in ranks for suit in suits]
+    return [card.copy() for card in _DECK_TEMPLATE]
 
 def is_valid_move(game: Dict[str, Any], player_id: str, move: Dict[str, Any]) -> bool:
     """Validate if the move is legal"""
@@ -245,6 +456,7 @@ def is_valid_move(game: Dict[str, Any], player_id: str, move: Dict[str, Any]) ->
 def update_game_state(game: Dict[str, Any], player_id: str, move: Dict[str, Any]) -> Dict[str, Any]:
     """Update game state based on the move"""
     game['moves'].append({
+        'seq': len(game['moves']),
         'player_id': player_id,
         'move': move,
         'timestamp': datetime.utcnow().isoformat()
@@ -289,7 +501,61 @@ class GameServiceTests(unittest.TestCase):
         response = self.app.post('/api/game/move', json=test_data)
         self.assertEqual(response.status_code, 200)
 
+    def test_write_game_updates_skips_rejected_op(self):
+        with patch.object(mongo, 'db') as mock_db, patch('time.sleep'):
+            mock_db.games.bulk_write.side_effect = [
+                BulkWriteError({'writeErrors': [{'index': 1, 'errmsg': 'rejected'}]}),
+                None
+            ]
+            write_game_updates(['op0', 'op1', 'op2'])
+            calls = mock_db.games.bulk_write.call_args_list
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(calls[1].args[0], ['op2'])
+
+    def test_write_game_updates_ignores_write_concern_error(self):
+        with patch.object(mongo, 'db') as mock_db, patch('time.sleep'):
+            mock_db.games.bulk_write.side_effect = BulkWriteError({'writeConcernErrors': [{'errmsg': 'timeout'}]})
+            write_game_updates(['op0', 'op1'])
+            self.assertEqual(mock_db.games.bulk_write.call_count, 1)
+
+    def test_write_game_updates_retries_connection_failure(self):
+        with patch.object(mongo, 'db') as mock_db, patch('time.sleep'):
+            mock_db.games.bulk_write.side_effect = [ConnectionFailure('reset'), None]
+            write_game_updates(['op0', 'op1'])
+            calls = mock_db.games.bulk_write.call_args_list
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(calls[1].args[0], ['op0', 'op1'])
+
+    def test_write_game_updates_drops_after_max_retries(self):
+        with patch.object(mongo, 'db') as mock_db, patch('time.sleep'):
+            mock_db.games.bulk_write.side_effect = ConnectionFailure('down')
+            write_game_updates(['op0'])
+            self.assertEqual(mock_db.games.bulk_write.call_count, MONGO_MAX_RETRIES)
+
+    def test_circuit_breaker_counts_error_responses(self):
+        breaker = CircuitBreaker()
+        failing = with_circuit_breaker(lambda: ('', 500))
+        with patch.dict(globals(), {'circuit_breaker': breaker}):
+            for _ in range(ERROR_THRESHOLD):
+                failing()
+        self.assertTrue(breaker.is_open())
+
+    def test_circuit_breaker_half_open_probe(self):
+        breaker = CircuitBreaker()
+        for _ in range(ERROR_THRESHOLD):
+            breaker.record_error()
+        self.assertTrue(breaker.is_open())
+        self.assertFalse(breaker.allow_request())
+
+        breaker.last_error_time -= RESET_TIMEOUT + 1
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "CLOSED")
+        self.assertEqual(breaker.errors, 0)
+
 if __name__ == '__main__':
+    # Development server only; containers run under gunicorn (see gunicorn_conf.py)
     import socket
     hostname = socket.gethostname()
     container_port = 5024
@@ -14,4 +14,4 @@ until nc -z redis 6387; do
 done
 
 # Start the application
-exec python app.py
\ No newline at end of file
+exec gunicorn -c gunicorn_conf.py app:app
\ No newline at end of file
@@ -0,0 +1,19 @@
+import os
+
+# Gunicorn configuration for the game service
+bind = f"0.0.0.0:{os.getenv('PORT', 5024)}"
+workers = int(os.getenv('GUNICORN_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+keepalive = 30
+timeout = 30
+
+# Each worker imports the app itself so its background threads
+# (Mongo writer, handler pool) are started after the fork
+preload_app = False
+
+# Limitations of running several workers:
+# - every worker has its own Mongo write-behind queue, so two moves for the
+#   same game can reach Mongo in either order; make_move pushes with
+#   $sort on the move's seq so the stored list still ends up ordered
+# - the Prometheus counters reported by /status are per worker